@@ -20,93 +20,202 @@ import json
 import sys
 import argparse
 import os
-from jsonschema import validate, ValidationError
+from concurrent.futures import ThreadPoolExecutor
 import xml.etree.ElementTree as ET
 try:
-    from lxml import etree
-    LXML_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    LXML_AVAILABLE = False
+    ORJSON_AVAILABLE = False
 import re
 
+# lxml is imported on first use by _load_xml_backend() so that runs which
+# never parse XML (--help, --version) do not pay for the import.
+etree = None
+LXML_AVAILABLE = None
+# Precompiled lxml XPath lookups, set by _load_xml_backend() when lxml is used
+_ROMS_XPATH = None
+_DESCRIPTION_XPATH = None
+
+
+def _load_xml_backend():
+    """
+    Import lxml if it has not been tried yet and compile the XPath lookups
+    read_dat uses with it. Return True if lxml is available.
+    """
+    global etree, LXML_AVAILABLE, _ROMS_XPATH, _DESCRIPTION_XPATH
+    if LXML_AVAILABLE is None:
+        try:
+            from lxml import etree
+            LXML_AVAILABLE = True
+        except ImportError:
+            LXML_AVAILABLE = False
+        if LXML_AVAILABLE:
+            # Compile the per-element paths once instead of on every call
+            _ROMS_XPATH = etree.XPath('rom')
+            _DESCRIPTION_XPATH = etree.XPath('description/text()', smart_strings=False)
+    return LXML_AVAILABLE
+
+
+def _xml_backend_name():
+    """
+    Describe the XML parser read_dat uses, noting whether the stdlib
+    ElementTree is backed by its C accelerator.
+    """
+    if _load_xml_backend():
+        return "lxml"
+    try:
+        import _elementtree
+    except ImportError:
+        return "ElementTree (pure Python)"
+    if ET.XMLParser is _elementtree.XMLParser:
+        return "ElementTree (C accelerator)"
+    return "ElementTree (pure Python)"
+
+# Characters allowed inside a region/tag parenthesis group
+_PAREN_GROUP_CHARS = frozenset(
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 ,.-')
+# Characters not allowed in output file names
+_UNSAFE_FILENAME_RE = re.compile(r'[\\/:*?"<>|]')
+
 
 def validate_xml(xml_path, verbose=False, enable_network=False):
     """
     Validate XML file against its schema if possible.
+    Well-formedness is not checked here unless a schema is fetched: read_dat
+    streams the whole file anyway and raises a parse error if it is not
+    well-formed, so only the root start tag is read to look for a schema.
+    Return (ok, tree), where tree is the parsed document if one was built so
+    read_dat can reuse it, and None otherwise.
     """
-    if not LXML_AVAILABLE:
+    if not _load_xml_backend():
         if verbose:
             print("lxml not installed, skipping XML schema validation. Only checking for well-formed XML.")
-        try:
-            ET.parse(xml_path)
-            if verbose:
-                print(f"{xml_path} is well-formed.")
-            return True
-        except ET.ParseError as e:
-            print(f"XML parse error: {e}")
-            return False
+        return True, None
     else:
         try:
-            tree = etree.parse(xml_path)
-            root = tree.getroot()
+            # Only the root start tag is needed to find the schema
+            _, root = next(etree.iterparse(xml_path, events=('start',)))
+            schema_url = None
             schema_location = root.attrib.get('{http://www.w3.org/2001/XMLSchema-instance}schemaLocation')
             if schema_location:
                 # schemaLocation is a string: "namespace url"
                 parts = schema_location.split()
                 if len(parts) == 2:
                     schema_url = parts[1]
-                    if not enable_network:
-                        print("Network validation required for schema, but --enable-network-validation not set. Skipping schema validation.")
-                        if verbose:
-                            print(f"Would fetch schema from {schema_url} if network validation was enabled.")
-                        return True
-                    import requests
-                    if verbose:
-                        print(f"Fetching schema from {schema_url}")
-                    resp = requests.get(schema_url)
-                    resp.raise_for_status()
-                    schema_doc = etree.XML(resp.content)
-                    schema = etree.XMLSchema(schema_doc)
-                    schema.assertValid(tree)
-                    if verbose:
-                        print(f"{xml_path} is valid against schema {schema_url}.")
-                    return True
-            # If no schema, just check well-formed
+            if schema_url is None:
+                if verbose:
+                    print(f"No schema found in {xml_path}, only checking for well-formed XML.")
+                return True, None
+            if not enable_network:
+                print("Network validation required for schema, but --enable-network-validation not set. Skipping schema validation.")
+                if verbose:
+                    print(f"Would fetch schema from {schema_url} if network validation was enabled.")
+                return True, None
+            import requests
+            if verbose:
+                print(f"Fetching schema from {schema_url}")
+            resp = requests.get(schema_url)
+            resp.raise_for_status()
+            schema_doc = etree.XML(resp.content)
+            schema = etree.XMLSchema(schema_doc)
+            tree = etree.parse(xml_path)
+            schema.assertValid(tree)
             if verbose:
-                print(f"No schema found in {xml_path}, only checked for well-formed XML.")
-            return True
+                print(f"{xml_path} is valid against schema {schema_url}.")
+            return True, tree
         except Exception as e:
             print(f"XML validation error: {e}")
-            return False
-        
-def read_dat(xml_path, verbose=False):
+            return False, None
+
+def _discard(elem):
     """
-    Parse the DAT XML file and return (header_description, games) tuple.
+    Free a fully processed lxml element and its already-processed preceding
+    siblings so the partial tree built by iterparse stays small.
     """
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
+    elem.clear()
+    while elem.getprevious() is not None:
+        del elem.getparent()[0]
 
-    # Get header/description
-    header = root.find('header')
-    header_description = header.findtext('description') if header is not None else None
+def _paren_groups(name):
+    """
+    Yield the text of each parenthesis group in a game name, e.g. "USA, Europe"
+    and "Rev 1" for "Game (USA, Europe) (Rev 1)". Groups containing other
+    characters, or starting with a comma, are skipped.
+    """
+    find = name.find
+    start = find('(')
+    while start >= 0:
+        end = find(')', start + 1)
+        if end < 0:
+            return
+        # Use the innermost opening parenthesis before the closing one
+        inner_start = name.rfind('(', start + 1, end)
+        if inner_start >= 0:
+            start = inner_start
+        text = name[start + 1:end]
+        if text and text[0] != ',' and _PAREN_GROUP_CHARS.issuperset(text):
+            yield text
+        start = find('(', end + 1)
 
-    # Collect game entries, extracting region from name
+def read_dat(xml_path, verbose=False, tree=None):
+    """
+    Parse the DAT XML file and return (header_description, games) tuple.
+    If tree is an already-parsed document for xml_path (see validate_xml),
+    it is read instead of parsing the file again.
+    """
+    _load_xml_backend()
+    header_description = None
     games = []
-    for game in root.findall('game'):
-        name = game.get('name')
+    # Bound methods hoisted out of the per-game loop
+    append_game = games.append
+    discard = _discard
+    roms_xpath = _ROMS_XPATH
+
+    if tree is not None:
+        elements = tree.getroot()
+    else:
+        # Stream the file so only one <game> subtree is held in memory at a time.
+        # lxml can filter by tag in C; the stdlib iterparse reports every element.
+        if LXML_AVAILABLE:
+            context = etree.iterparse(xml_path, events=('end',), tag=('header', 'game'))
+            elements = (elem for _, elem in context)
+        else:
+            # ElementTree elements have no parent links, so processed children
+            # are dropped by clearing the root taken from the first start event
+            context = ET.iterparse(xml_path, events=('start', 'end'))
+            _, root = next(context)
+            elements = (elem for event, elem in context if event == 'end')
+            def discard(elem):
+                root.clear()
+    for elem in elements:
+        tag = elem.tag
+        if tag == 'header':
+            if _DESCRIPTION_XPATH is not None:
+                texts = _DESCRIPTION_XPATH(elem)
+                header_description = texts[0] if texts else None
+            else:
+                header_description = elem.findtext('description') or None
+            discard(elem)
+            continue
+        if tag != 'game':
+            continue
+        game = elem
+        roms = roms_xpath(game) if roms_xpath is not None else game.findall('rom')
+        get = game.get
+        name = get('name')
         # First parenthesis group is region(s), all others are tags
         regions = []
         tags = []
         if name:
             # Find all parenthesis groups
-            matches = list(re.finditer(r'\(([A-Za-z0-9 .\-]+(?:,[A-Za-z0-9 .\-]+)*)\)', name))
-            if matches:
+            groups = list(_paren_groups(name))
+            if groups:
                 # First group is region(s)
-                region_text = matches[0].group(1)
+                region_text = groups[0]
                 regions = [r.strip() for r in region_text.split(',') if r.strip()]
                 # All remaining groups are tags
-                for m in matches[1:]:
-                    tag_text = m.group(1)
+                for tag_text in groups[1:]:
                     tags.extend([t.strip() for t in tag_text.split(',') if t.strip()])
             if verbose:
                 print(f"Game: {name}")
@@ -114,19 +223,17 @@ def read_dat(xml_path, verbose=False):
                 print(f"  Tags: {tags}")
         game_info = {
             'name': name,
-            'id': game.get('id'),
-            'cloneofid': game.get('cloneofid'),
-            'roms': [],
+            'id': get('id'),
+            'cloneofid': get('cloneofid'),
+            'roms': [
+                {'name': rom.get('name'), 'crc': rom.get('crc')}
+                for rom in roms
+            ],
             'regions': regions,
             'tags': tags
         }
-        for rom in game.findall('rom'):
-            rom_info = {
-                'name': rom.get('name'),
-                'crc': rom.get('crc')
-            }
-            game_info['roms'].append(rom_info)
-        games.append(game_info)
+        append_game(game_info)
+        discard(game)
     
     if verbose:
         # Collect all unique regions and tags
@@ -142,19 +249,40 @@ def read_dat(xml_path, verbose=False):
     return header_description, games
 
 
-def dat2lpl_split(args, games, header_description):
+# crc -> "CRC|crc" playlist field; DATs repeat CRCs across parents and clones
+_CRC_FIELDS = {}
+
+def _crc_field(crc):
     """
-    Convert DAT XML to LPL JSON playlist for Non-merged or Split sets.
-    If games/header_description are provided, use them (for region split mode).
-    Otherwise, read from the DAT file.
+    Return the LPL crc32 field for a ROM CRC, e.g. "3C41070F|crc".
     """
-    if games is None or header_description is None:
-        header_description, games = read_dat(args.input, getattr(args, 'verbose', False))
-    if getattr(args, 'verbose', False):
-        print(f"Header description: {header_description}")
-        print(f"Found {len(games)} games.")
+    if not crc:
+        return "|crc"
+    field = _CRC_FIELDS.get(crc)
+    if field is None:
+        field = _CRC_FIELDS[crc] = crc.upper() + "|crc"
+    return field
+
+def _make_item(game, rom, path, db_name):
+    """
+    Build a single LPL playlist item for a game's ROM.
+    """
+    return {
+        "path": path,
+        "label": game['name'],
+        "core_path": "DETECT",
+        "core_name": "DETECT",
+        "crc32": _crc_field(rom['crc']),
+        "db_name": db_name
+    }
 
-    lpl = {
+def _build_lpl(games, header_description, path_fn):
+    """
+    Build the LPL playlist object for games, using path_fn(game, rom) to
+    produce each item's path. Games without ROMs are skipped.
+    """
+    db_name = f"{header_description}.lpl" if header_description else "playlist.lpl"
+    return {
         "version": "1.5",
         "default_core_path": "",
         "default_core_name": "",
@@ -163,89 +291,122 @@ def dat2lpl_split(args, games, header_description):
         "left_thumbnail_mode": 0,
         "thumbnail_match_mode": 0,
         "sort_mode": 0,
-        "items": []
+        "items": [
+            _make_item(game, game['roms'][0], path_fn(game, game['roms'][0]), db_name)
+            for game in games if game['roms']
+        ]
     }
 
-    db_name = f"{header_description}.lpl" if header_description else "playlist.lpl"
+def dat2lpl_split(args, games, header_description):
+    """
+    Convert DAT XML to LPL JSON playlist for Non-merged or Split sets.
+    If games are provided, use them with header_description.
+    Otherwise, read from the DAT file.
+    """
+    if games is None:
+        header_description, games = read_dat(args.input, getattr(args, 'verbose', False))
+    if getattr(args, 'verbose', False):
+        print(f"Header description: {header_description}")
+        print(f"Found {len(games)} games.")
 
-    for game in games:
-        if not game['roms']:
-            continue
-        rom = game['roms'][0]
-        if args.archive_format == 'None':
-            path = os.path.join(args.input_path, game['name'], rom['name'])
-        else:
-            archive_file = f"{game['name']}{args.archive_format}"
-            path = os.path.join(args.input_path, archive_file)
-        item = {
-            "path": path,
-            "label": game['name'],
-            "core_path": "DETECT",
-            "core_name": "DETECT",
-            "crc32": f"{rom['crc'].upper()}|crc" if rom['crc'] else "|crc",
-            "db_name": db_name
-        }
-        lpl["items"].append(item)
+    # Paths are built with f-strings rather than os.path.join per item;
+    # joining with '' gives the root with exactly one trailing separator.
+    root = os.path.join(args.input_path, '')
+    sep = os.sep
+    archive_format = args.archive_format
+    if archive_format == 'None':
+        def path_fn(game, rom):
+            return f"{root}{game['name']}{sep}{rom['name']}"
+    else:
+        def path_fn(game, rom):
+            return f"{root}{game['name']}{archive_format}"
 
-    return lpl
+    return _build_lpl(games, header_description, path_fn)
 
-def dat2lpl_merged(args, games, header_description, games_master):
+def dat2lpl_merged(args, games, header_description, id_to_name=None):
     """
     Convert DAT XML to LPL JSON playlist for merged sets.
-    If games/header_description are provided, use them (for region split mode).
+    If games are provided, use them with header_description.
     Otherwise, read from the DAT file.
+    id_to_name maps game IDs to names across the whole DAT and is used to
+    find a clone's parent; it is built from games if not provided.
     """
-    if games is None or header_description is None:
+    if games is None:
         header_description, games = read_dat(args.input, getattr(args, 'verbose', False))
-        games_master = games
     if getattr(args, 'verbose', False):
         print(f"Header description: {header_description}")
         print(f"Found {len(games)} games.")
 
-    lpl = {
-        "version": "1.5",
-        "default_core_path": "",
-        "default_core_name": "",
-        "label_display_mode": 0,
-        "right_thumbnail_mode": 0,
-        "left_thumbnail_mode": 0,
-        "thumbnail_match_mode": 0,
-        "sort_mode": 0,
-        "items": []
-    }
+    if id_to_name is None:
+        id_to_name = {g['id']: g['name'] for g in games if g['id']}
 
-    db_name = f"{header_description}.lpl" if header_description else "playlist.lpl"
-    id_to_name = {g['id']: g['name'] for g in games_master if g['id']}
+    root = os.path.join(args.input_path, '')
+    sep = os.sep
+    archive_format = args.archive_format
+    # Clones are stored in their parent's archive/directory
+    if archive_format == 'None':
+        def path_fn(game, rom):
+            archive_dir = id_to_name.get(game['cloneofid'], game['name'])
+            return f"{root}{archive_dir}{sep}{rom['name']}"
+    else:
+        def path_fn(game, rom):
+            archive_dir = id_to_name.get(game['cloneofid'], game['name'])
+            return f"{root}{archive_dir}{archive_format}#{rom['name']}"
 
-    for game in games:
-        if not game['roms']:
-            continue
-        rom = game['roms'][0]
-        if game['cloneofid'] and game['cloneofid'] in id_to_name:
-            archive_dir = id_to_name[game['cloneofid']]
-        else:
-            archive_dir = game['name']
-        if args.archive_format == 'None':
-            path = os.path.join(args.input_path, archive_dir, rom['name'])
-        else:
-            archive_file = f"{archive_dir}{args.archive_format}"
-            path = os.path.join(args.input_path, archive_file) + '#' + rom['name']
-        item = {
-            "path": path,
-            "label": game['name'],
-            "core_path": "DETECT",
-            "core_name": "DETECT",
-            "crc32": f"{rom['crc'].upper()}|crc" if rom['crc'] else "|crc",
-            "db_name": db_name
-        }
-        lpl["items"].append(item)
+    return _build_lpl(games, header_description, path_fn)
+
+def _dumps(obj, indent=False):
+    """
+    Serialize obj to UTF-8 JSON bytes, using orjson when available.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def _iter_lpl_bytes(lpl, compact=False):
+    """
+    Yield the serialized JSON for an LPL playlist object in chunks. Compact
+    output is produced one item at a time rather than all at once.
+    """
+    if not compact:
+        yield _dumps(lpl, indent=True)
+        return
+    header = {key: value for key, value in lpl.items() if key != 'items'}
+    # Leave the header object open so the items array can be appended
+    yield _dumps(header)[:-1]
+    yield b',"items":['
+    for i, item in enumerate(lpl['items']):
+        if i:
+            yield b','
+        yield _dumps(item)
+    yield b']}'
 
-    return lpl
+def write_lpl(lpl, path, compact=False):
+    """
+    Write an LPL playlist object to path, streaming it chunk by chunk.
+    """
+    with open(path, 'wb') as f:
+        f.writelines(_iter_lpl_bytes(lpl, compact))
+
+def write_lpls(outputs, compact=False, max_workers=8):
+    """
+    Write several (lpl, path) playlists from a thread pool. Each worker streams
+    its playlist with write_lpl; serialization holds the GIL, so only the
+    file I/O of independent outputs overlaps.
+    """
+    if not outputs:
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(outputs))) as executor:
+        futures = [executor.submit(write_lpl, lpl, path, compact) for lpl, path in outputs]
+        for future in futures:
+            future.result()
 
 def main():
     parser = argparse.ArgumentParser(
         description="Convert DAT XML to LPL JSON playlist.",
-        usage="%(prog)s [-h] --input-path INPUT_PATH [--archive-format {None,.zip,.7z}] [-s {Non-merged,Split,Merged}] [-o OUTPUT] [-r [--map MAPFILE] [--map-world]] [-v] input"
+        usage="%(prog)s [-h] --input-path INPUT_PATH [--archive-format {None,.zip,.7z}] [-s {Non-merged,Split,Merged}] [-o OUTPUT] [-r [--map MAPFILE] [--map-world]] [--compact | --no-compact] [-v] input"
     )
     parser.add_argument("input", help="Input DAT XML file")
     parser.add_argument("--input-path", required=True, help="Root path for searching ROM files (required)")
@@ -255,34 +416,51 @@ def main():
     parser.add_argument("-r", "--region-split", action="store_true", help="Produce separate output files by region")
     parser.add_argument("--map", help="JSON file mapping country/region to output value (requires -r)")
     parser.add_argument("--map-world", action="store_true", help="Treat 'World' like any other region (do not add to all output files)")
+    parser.add_argument("--compact", action=argparse.BooleanOptionalAction, default=None, help="Write JSON without indentation (default: compact unless -v is given)")
     parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose output")
     parser.add_argument("--enable-network-validation", action="store_true", help="Allow network access for XML schema validation")
     parser.add_argument("--version", action="version", version="dat2lpl 1.2.0")
     args = parser.parse_args()
+    if args.compact is None:
+        args.compact = not args.verbose
+
+    if args.verbose:
+        print(f"XML parser: {_xml_backend_name()}")
 
-    if not validate_xml(args.input, args.verbose, args.enable_network_validation):
+    ok, tree = validate_xml(args.input, args.verbose, args.enable_network_validation)
+    if not ok:
+        print("Input XML is not valid. Exiting.")
+        sys.exit(1)
+    # read_dat's streaming pass is also the well-formedness check
+    parse_errors = (ET.ParseError, etree.XMLSyntaxError) if LXML_AVAILABLE else ET.ParseError
+    try:
+        header_description, games_master = read_dat(args.input, args.verbose, tree)
+    except parse_errors as e:
+        print(f"XML parse error: {e}")
         print("Input XML is not valid. Exiting.")
         sys.exit(1)
 
     if not args.region_split:
         if args.storage_mode == "Merged":
-            lpl = dat2lpl_merged(args, None, None, None)
+            lpl = dat2lpl_merged(args, games_master, header_description)
         else:
-            lpl = dat2lpl_split(args, None, None)
+            lpl = dat2lpl_split(args, games_master, header_description)
 
         if args.verbose:
             print("LPL output object:")
-            print(json.dumps(lpl, indent=2))
+            print(b''.join(_iter_lpl_bytes(lpl)).decode('utf-8'))
 
         # Write output file
-        with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump(lpl, f, indent=2)
+        write_lpl(lpl, args.output, args.compact)
         if args.verbose:
             print(f"Wrote LPL file to {args.output}")
         return
 
     # Region split mode with mapping
-    header_description, games_master = read_dat(args.input, getattr(args, 'verbose', False))
+    # Parent lookup for merged sets, shared by every output file
+    id_to_name = None
+    if args.storage_mode == "Merged":
+        id_to_name = {g['id']: g['name'] for g in games_master if g['id']}
     # Load mapping file
     if (args.map is not None):
         try:
@@ -294,64 +472,57 @@ def main():
     else:
         region_map_json = {}
 
-    # Build output_value -> list of games
-    output_map = {}  # output_value -> list of games
+    # Build output_value -> {game name: game}, keeping the first game seen
+    # under each name so every output value lists a game only once
+    output_map = {}
     all_output_values = set(region_map_json.values())
     for g in games_master:
         regions = g['regions']
         if not regions:
             continue
+        name = g['name']
         if 'World' in regions and not getattr(args, 'map_world', False):
             # Default: If 'World' is present, add to all output files (except 'World' itself)
             for outval in all_output_values:
                 if outval != 'World':
-                    output_map.setdefault(outval, []).append(g)
+                    output_map.setdefault(outval, {}).setdefault(name, g)
             continue
         # Otherwise, map each region to output value
         for region in regions:
             outval = region_map_json.get(region, region)
             if outval:
-                output_map.setdefault(outval, []).append(g)
-
-    # Remove duplicates in each output value
-    for outval in output_map:
-        seen = set()
-        unique_games = []
-        for g in output_map[outval]:
-            key = g['name']
-            if key not in seen:
-                unique_games.append(g)
-                seen.add(key)
-        output_map[outval] = unique_games
+                output_map.setdefault(outval, {}).setdefault(name, g)
 
     # Output a file for each output value
-    for outval, out_games in output_map.items():
+    outputs = []  # (lpl, output file name), written together below
+    for outval, games_by_name in output_map.items():
+        out_games = list(games_by_name.values())
         if args.storage_mode == "Merged":
-            lpl = dat2lpl_merged(args, out_games, header_description, games_master)
+            lpl = dat2lpl_merged(args, out_games, header_description, id_to_name)
         else:
             lpl = dat2lpl_split(args, out_games, header_description)
         # Output file name: output-filename (output_value).lpl
         base, ext = os.path.splitext(args.output)
-        safe_outval = re.sub(r'[\\/:*?"<>|]', '', outval)
+        safe_outval = _UNSAFE_FILENAME_RE.sub('', outval)
         outname = f"{base} ({safe_outval}){ext}"
         if args.verbose:
             print(f"Writing region file: {outname} with {len(lpl['items'])} items.")
-        with open(outname, 'w', encoding='utf-8') as f:
-            json.dump(lpl, f, indent=2)
+        outputs.append((lpl, outname))
 
     # Output a special file for games with no region
     no_region_games = [g for g in games_master if not g['regions']]
     if no_region_games:
         if args.storage_mode == "Merged":
-            lpl = dat2lpl_merged(args, no_region_games, header_description)
+            lpl = dat2lpl_merged(args, no_region_games, header_description, id_to_name)
         else:
             lpl = dat2lpl_split(args, no_region_games, header_description)
         base, ext = os.path.splitext(args.output)
         outname = f"{base} (No Region){ext}"
         if args.verbose:
             print(f"Writing special file for games with no region: {outname} with {len(lpl['items'])} items.")
-        with open(outname, 'w', encoding='utf-8') as f:
-            json.dump(lpl, f, indent=2)
+        outputs.append((lpl, outname))
+
+    write_lpls(outputs, args.compact)
 
 if __name__ == "__main__":
     main()